@@ -2,11 +2,24 @@
 This file contains mechanisms for parsing and acting upon the UDP logging format
 used by the Source engine games.
 """
-import select
+import logging
 import socket
+import struct
+import sys
+import time
 
 from . import util
 
+_logger = logging.getLogger(__name__)
+
+# Linux's SO_RXQ_OVFL option, which the socket module doesn't always export.
+# With it turned on, each datagram comes with a count of how many datagrams the
+# kernel has dropped on the socket so far, as an unsigned 32-bit integer. The
+# fallback is the asm-generic value used by most architectures, including x86
+# and ARM - alpha, mips, parisc and sparc use their own values.
+SO_RXQ_OVFL = getattr(socket, 'SO_RXQ_OVFL', 40)
+DROP_COUNT = struct.Struct('=I')
+
 class LogSocket(util.Dispatcher):
     """
     A LogSocket sits on the network, and processes logging elements as they
@@ -19,14 +32,30 @@ class LogSocket(util.Dispatcher):
     Where timestamp is a datetime.datetime, and message is a bytestring. The
     only exception to this is when the last log entry is processed, in which
     case both are None.
+
+    On Linux, dropped_datagrams counts the log datagrams that the kernel had
+    to drop because they arrived faster than they were processed.
     """
-    READ_SIZE = 1024
+    READ_SIZE = 4096
+
+    # The kernel's default receive buffer is small enough that bursts of log
+    # traffic (say, at the end of a round) can overflow it, and UDP will drop
+    # whatever doesn't fit. Note that Linux caps this at net.core.rmem_max.
+    RECEIVE_BUFFER_SIZE = 8 * 1024 * 1024
+
+    # When the kernel starts dropping datagrams, it usually drops some between
+    # almost every pair that we receive, so only warn about drops this often
+    # (in seconds) to avoid slowing down the receiver even more
+    DROP_WARNING_INTERVAL = 10
 
     def __init__(self, ip, port):
         super().__init__()
-        self.buffer = b''
+        self.buffer = bytearray()
         self.sock_address = (ip, port)
         self.socket = None
+        self.dropped_datagrams = 0
+        self._unreported_drops = 0
+        self._last_drop_warning = None
 
     def start(self):
         """
@@ -35,26 +64,62 @@ class LogSocket(util.Dispatcher):
         >>> log.start() # Blocking, until log.stop() is called
         """
         self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.dropped_datagrams = 0
+        self._unreported_drops = 0
+        self._last_drop_warning = None
+        self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF,
+                               self.RECEIVE_BUFFER_SIZE)
         self.socket.bind(self.sock_address)
 
-        pollster = select.epoll()
-        pollster.register(self.socket, select.EPOLLIN)
+        # Linux doesn't complain when it caps the buffer size, so check what
+        # we actually got. (It reports double the real size, since it counts
+        # its own bookkeeping overhead.)
+        buffer_size = self.socket.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF)
+        if sys.platform.startswith('linux'):
+            buffer_size //= 2
 
-        try:
-            while True:
-                pollster.poll()
-                chunk, _ = self.socket.recvfrom(1024)
-                self.buffer += chunk
+        if buffer_size < self.RECEIVE_BUFFER_SIZE:
+            _logger.warning('Log socket receive buffer is %d bytes instead '
+                            'of %d; raise net.core.rmem_max to avoid dropping '
+                            'messages', buffer_size, self.RECEIVE_BUFFER_SIZE)
 
-                *messages, self.buffer = self.buffer.split(b'\0')
-                for message in messages:
-                    # Trim off the header, which is 6 bytes of junk plus a space.
-                    # The message also has a trailing newline which we want to
-                    # get rid of.
-                    message = message[7:-1]
-                    timestamp, message = util.parse_timestamp(message)
+        if sys.platform.startswith('linux'):
+            self.socket.setsockopt(socket.SOL_SOCKET, SO_RXQ_OVFL, 1)
 
-                    self.fire(timestamp, message)
+        try:
+            while True:
+                # There's only the one socket to wait on, so a blocking read
+                # does the waiting itself without a separate poll. (Setting a
+                # timeout wouldn't help either, since Python implements it by
+                # polling before every read.)
+                chunk, ancillary, _, _ = self.socket.recvmsg(
+                    self.READ_SIZE, socket.CMSG_SPACE(DROP_COUNT.size))
+                self.buffer.extend(chunk)
+
+                for level, kind, data in ancillary:
+                    if level == socket.SOL_SOCKET and kind == SO_RXQ_OVFL:
+                        self._update_dropped_datagrams(*DROP_COUNT.unpack(data))
+
+                # Pull off each complete message, and then drop them all from
+                # the buffer at once, rather than copying whatever is left over
+                # after every message
+                start = 0
+                end = self.buffer.find(b'\0')
+                with memoryview(self.buffer) as view:
+                    while end != -1:
+                        # Trim off the header, which is 6 bytes of junk plus a
+                        # space. The message also has a trailing newline which
+                        # we want to get rid of. Slicing the view means that
+                        # the message is only copied once, into the bytes.
+                        message = bytes(view[start + 7:end - 1])
+                        timestamp, message = util.parse_timestamp(message)
+
+                        self.fire(timestamp, message)
+
+                        start = end + 1
+                        end = self.buffer.find(b'\0', start)
+
+                del self.buffer[:start]
 
                 # Make sure that we don't process anything else, if one of the
                 # callbacks killed us
@@ -66,6 +131,29 @@ class LogSocket(util.Dispatcher):
 
         self.fire(None, None)
 
+    def _update_dropped_datagrams(self, dropped_datagrams):
+        """
+        Records the kernel's running count of dropped datagrams, warning about
+        any new drops at most once every DROP_WARNING_INTERVAL seconds.
+        """
+        if dropped_datagrams == self.dropped_datagrams:
+            return
+
+        # The kernel's counter is only 32 bits, so it can wrap around
+        self._unreported_drops += (
+            (dropped_datagrams - self.dropped_datagrams) % (1 << 32))
+        self.dropped_datagrams = dropped_datagrams
+
+        now = time.monotonic()
+        if (self._last_drop_warning is not None and
+                now - self._last_drop_warning < self.DROP_WARNING_INTERVAL):
+            return
+
+        _logger.warning('%d log datagrams were dropped (%d in total)',
+                        self._unreported_drops, dropped_datagrams)
+        self._unreported_drops = 0
+        self._last_drop_warning = now
+
     def stop(self):
         """
         Cleans up the socket, and stops running the server.
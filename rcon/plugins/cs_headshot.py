@@ -14,11 +14,21 @@ Configuration Options
     count_bots=no
 """
 from collections import defaultdict
+import re
 
 from .. import util
 
+HEADSHOT = b'(headshot)'
+HEADSHOTS_QUERY = b'" say "!headshots'
+
+# Chat messages are of the form '"NAME<PLAYER_ID><USER_ID><TEAM>" say "TEXT"'.
+# This picks out the ones that are headshot queries, along with the name of
+# the player who asked and the text of the query.
+HEADSHOTS_QUERY_REGEX = re.compile(
+    rb'"(.*)<[^<>]*><[^<>]*><[^<>]*>" say "(!headshots[^"]*)"')
+
 def init(rcon, logger, config):
-    headshots = {}
+    headshots = defaultdict(int)
     reset_policy = config.get('when_reset', 'never')
     count_bots = config.get('count_bots', 'no')
 
@@ -32,38 +42,42 @@ def init(rcon, logger, config):
 
     @logger.register
     def on_message(timestamp, message):
-        nonlocal headshots
         if message is None:
             return
 
-        if b'(headshot)' in message:
-            killer_long, _, _ = list(util.get_quoted_strings(message))
+        if HEADSHOT in message:
+            killer_long, _, _ = util.get_quoted_strings(message)
             killer, _, player_type, _ = util.parse_player_info(killer_long)
 
             if player_type == b'BOT' and not count_bots:
                 return
 
-            if killer not in headshots:
-                headshots[killer] = 0
-
             headshots[killer] += 1
-        elif b'" say "' in message and b'"!headshots' in message:
-            requester_long, query = list(util.get_quoted_strings(message))
+        elif HEADSHOTS_QUERY in message:
+            # The substring check is much cheaper than the regex on the lines
+            # that aren't queries, so only extract the query once we know
+            # that there is one
+            query_match = HEADSHOTS_QUERY_REGEX.match(message)
+            if query_match is None:
+                return
+
+            requester, query = query_match.groups()
             if query.strip() == b'!headshots':
-                who , _, _, _ = util.parse_player_info(requester_long)
+                who = requester
             else:
                 try:
                     who = query.split(maxsplit=1)[1]
-                except ValueError:
+                except IndexError:
                     rcon.execute_command('say [HEADSHOTS] Command must be either "!headshots" or "!headshots <PLAYER>" or "!headshots *"')
                     return
 
             if who == b'*':
-                for player, count in headshots.items():
-                    rcon.execute_command('say [HEADSHOTS] {} has {}'.format(player.decode('ascii'), headshots.get(player, 0)))
+                rcon.execute_commands(
+                    'say [HEADSHOTS] {} has {}'.format(player.decode('ascii'), count)
+                    for player, count in headshots.items())
             else:
                 rcon.execute_command('say [HEADSHOTS] {} has {}'.format(who.decode('ascii'), headshots.get(who, 0)))
         elif reset_policy == 'round' and message == b'World triggered "Round_Start"':
-            headshots = {}
+            headshots.clear()
         elif reset_policy == 'map' and message.startswith(b'Started map'):
-            headshots = {}
+            headshots.clear()
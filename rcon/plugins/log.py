@@ -9,12 +9,24 @@ Configuration Options
     filename=/dev/null
 """
 def init(rcon, logger, config):
-    handle = open(config['filename'], 'w')
+    # The messages are already bytes, so write them out directly rather than
+    # decoding them and going through print()
+    handle = open(config['filename'], 'wb', buffering=64 * 1024)
+
+    # Messages arrive in bursts which share the same timestamp, so only
+    # format the timestamp when it changes
+    last_timestamp = None
+    last_timestamp_bytes = b''
 
     @logger.register
     def on_message(timestamp, message):
+        nonlocal last_timestamp, last_timestamp_bytes
         if message is None:
             handle.close()
             return
 
-        print('{}: {}'.format(timestamp, message.decode('ascii')), file=handle)
+        if timestamp != last_timestamp:
+            last_timestamp = timestamp
+            last_timestamp_bytes = str(timestamp).encode('ascii')
+
+        handle.write(b'%s: %s\n' % (last_timestamp_bytes, message))
@@ -48,6 +48,11 @@ SERVERDATA_EXECCOMMAND = 2
 SERVERDATA_AUTH_RESPONSE = 2
 SERVERDATA_RESPONSE_VALUE = 0
 
+# The maximum allowed value for the 'Size' field in the header is 4096. Take
+# away 10 for the overhead (explained in RCON._build_packet), and you get that
+# 4086 is the maximum body size.
+MAX_BODY_SIZE = 4086
+
 # The 'id' of a sent packet is a randomly generated integer, used for 
 # identifying packets that are responses to other packets (since they'll
 # share IDs). The packet itself is a bytestring.
@@ -58,6 +63,13 @@ SentPacketInfo = namedtuple('SentPacketInfo', ['id', 'packet'])
 ReceivedPacketInfo = namedtuple('ReceivedPacketInfo',
     ['id', 'type', 'body'])
 
+# The integer fields of the packet header, compiled once rather than having
+# struct re-parse the format on every packet. 'Size' is read on its own, since
+# it determines how much more of the packet there is to read.
+SIZE_FIELD = struct.Struct('<i')
+ID_AND_TYPE_FIELDS = struct.Struct('<ii')
+HEADER_FIELDS = struct.Struct('<iii')
+
 class RCON:
     """
     Represents a running RCON connection.
@@ -66,6 +78,11 @@ class RCON:
         self.sock = socket.socket()
         self.sock.connect((host, port))
 
+        # Reading through a buffered file means that we can ask for exactly
+        # the number of bytes that we need, without having to reassemble them
+        # from partial recv() calls ourselves
+        self.sock_reader = self.sock.makefile('rb')
+
     def _build_packet(self, packet_type, body_content):
         """
         Builds a packet which can be sent over the data socket, returning a
@@ -74,72 +91,56 @@ class RCON:
         'packet_type' can be anything of the 'SERVERDATA_*' values, and
         'body_content' is the text of the packet's body.
         """
-        # The maximum allowed value for the 'Size' field in the header is
-        # 4096. Take away 10 for the overhead (explained below), and you get
-        # that 4086 is the maximum body size.
-        if len(body_content) > 4086:
-            raise ValueError('Cannot have a body size above 4086 bytes')
+        if len(body_content) > MAX_BODY_SIZE:
+            raise ValueError(
+                'Cannot have a body size above {} bytes'.format(MAX_BODY_SIZE))
 
         # 'Identifier' is 4 bytes, 'Type' is 4 bytes, 'NUL' is 1 byte,
         # and the body is NUL terminated, (an extra 1 byte).
         PACKET_OVERHEAD = 10
 
         # Avoid negative IDs, since -1 can be a special value from the server
-        # when receiving SERVERDATA_AUTH_RESPONSE
-        MAX_ID = (2 << 30) - 1
-        packet_id = random.randint(1, MAX_ID)
-        
-        return SentPacketInfo(packet_id,
-            (struct.pack('<i', len(body_content) + PACKET_OVERHEAD) +
-             struct.pack('<i', packet_id) +
-             struct.pack('<i', packet_type) + 
-             bytes(body_content, 'ascii') + 
-             b'\0\0'))
+        # when receiving SERVERDATA_AUTH_RESPONSE. 31 random bits always fit
+        # into a positive 32-bit signed integer, and zero is bumped up to 1.
+        packet_id = random.getrandbits(31) or 1
+
+        body = bytes(body_content, 'ascii')
+        header = HEADER_FIELDS.pack(len(body) + PACKET_OVERHEAD,
+                                    packet_id,
+                                    packet_type)
+
+        return SentPacketInfo(packet_id, b''.join((header, body, b'\0\0')))
 
     def _read_packet(self):
         """
         Reads an RCON packet, while doing some basic validation to avoid
         processing invalid packets. Returns a 'ReceivedPacketInfo' structure.
         """
-        # *Ensure* that we get the whole size. This is unlikely to fail (and
-        # thus hit the loop), but we have to be sure.
-        raw_size = self.sock.recv(4)
-        if not raw_size:
+        raw_size = self.sock_reader.read(4)
+        if len(raw_size) < 4:
             raise OSError('Connection failure')
 
-        while len(raw_size) < 4:
-            raw_size += self.sock.recv(4 - len(raw_size))
-
         # Decode the size - if it is >4096, then bail, since this is a corrupt
         # packet. (If its <10, then its also invalid, since the header is
         # counted).
-        (size,) = struct.unpack('<i', raw_size)
+        (size,) = SIZE_FIELD.unpack(raw_size)
         if size < 10:
             raise ValueError('{} is an invalid packet size'.format(size))
         if size > 4096:
             print('WARNING: Packet size was greater than maximum allowed by protocol',
                   file=sys.stderr)
 
-        raw_packet = self.sock.recv(size)
-        while len(raw_packet) < size:
-            raw_packet += self.sock.recv(size - len(raw_packet))
-
-        # Ensure here that the 'Type' field is valid
-        TYPE_OFFSET = 4 # The type is 4 bytes after the end of the 'Size' 
-                        # field
+        raw_packet = self.sock_reader.read(size)
+        if len(raw_packet) < size:
+            raise OSError('Connection failure')
 
-        # Extract the other fields we care about
-        ID_OFFSET = 0 # The ID is immediately after the end of the 'Size'
-                      # field
+        # The ID and the type are the two fields immediately after the end of
+        # the 'Size' field, and the body follows them
+        packet_id, packet_type = ID_AND_TYPE_FIELDS.unpack_from(raw_packet)
 
         BODY_OFFSET = 8 # The body is 8 bytes after the end of the 'Size'
                         # field
 
-        (packet_id,) = struct.unpack('<i', raw_packet[ID_OFFSET:ID_OFFSET + 4])
-
-        (packet_type,) = struct.unpack('<i', 
-            raw_packet[TYPE_OFFSET:TYPE_OFFSET + 4])
-
         # The '-2' strips off both NUL values
         packet_body = str(raw_packet[BODY_OFFSET:-2], 'ascii')
 
@@ -211,10 +212,53 @@ class RCON:
 
         return ''.join(response_bodies)
 
+    def execute_commands(self, commands):
+        """
+        Executes several string commands, returning their combined results as
+        a string.
+
+        The server runs commands separated by ';' one after another, so this
+        packs as many commands into each request as will fit, which is much
+        cheaper than a round trip for each command. Commands which contain
+        '"' or ';' are always sent on their own, since the server doesn't
+        split on a ';' inside quotes - one unmatched quote would otherwise
+        swallow every command batched after it.
+
+        >>> rcon.execute_commands(['say Hello,', 'say World!'])
+        """
+        results = []
+        batch = []
+        batch_size = 0
+        for command in commands:
+            is_standalone = '"' in command or ';' in command
+
+            # Account for the '; ' that this command would be joined with
+            if batch and (is_standalone or
+                          batch_size + 2 + len(command) > MAX_BODY_SIZE):
+                results.append(self.execute_command('; '.join(batch)))
+                batch = []
+                batch_size = 0
+
+            if is_standalone:
+                results.append(self.execute_command(command))
+                continue
+
+            if batch:
+                batch_size += 2
+
+            batch.append(command)
+            batch_size += len(command)
+
+        if batch:
+            results.append(self.execute_command('; '.join(batch)))
+
+        return ''.join(results)
+
     def close(self):
         """
         Disconnects from an RCON session.
 
         >>> rcon.close()
         """
+        self.sock_reader.close()
         self.sock.close()
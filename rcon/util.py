@@ -2,15 +2,26 @@
 Various utilities used for different purposes.
 """
 import datetime
+import functools
+
+__all__ = ('Dispatcher', 'parse_timestamp', 'parse_player_info',
+           'get_quoted_strings')
 
 class Dispatcher:
     """
-    A generic event dispatcher for broadcasting messages to functions.
+    A generic event dispatcher for broadcasting messages to functions. Handlers
+    are invoked in the order that they were registered.
     """
     def __init__(self):
-        self.handlers = set()
-        self.to_remove = set()
-        self.is_running_handlers = False
+        # The handlers are the keys of the dict (the values are unused), which
+        # keeps them in the order they were registered while still making
+        # unregistering cheap
+        self.handlers = {}
+
+        # fire() iterates over this snapshot of the handlers rather than the
+        # dict itself, which means that handlers can be (un)registered while
+        # the handlers are running without disturbing the current dispatch
+        self.handler_snapshot = ()
 
     def register(self, handler):
         """
@@ -24,7 +35,8 @@ class Dispatcher:
         >>> other_handler = lambda: ...
         >>> dispatch.register(other_handler)
         """
-        self.handlers.add(handler)
+        self.handlers[handler] = None
+        self.handler_snapshot = tuple(self.handlers)
         return handler
 
     def unregister(self, handler):
@@ -33,11 +45,8 @@ class Dispatcher:
 
         >>> dispatch.unregister(handler)
         """
-        if not self.is_running_handlers:
-            self.handlers.remove(handler)
-        else:
-            self.to_remove.add(handler)
-
+        del self.handlers[handler]
+        self.handler_snapshot = tuple(self.handlers)
         return handler
 
     def fire(self, *args, **kwargs):
@@ -46,60 +55,75 @@ class Dispatcher:
 
         >>> dispatch.fire(1, 2, 3, a=4, b=5)
         """
-        self.is_running_handlers = True
-        for handler in self.handlers:
-            handler(*args, **kwargs)
-
-        self.is_running_handlers = False
+        # Nearly every message is fired without keyword arguments, and calling
+        # each handler without an empty '**kwargs' is noticeably cheaper
+        if kwargs:
+            for handler in self.handler_snapshot:
+                handler(*args, **kwargs)
+        else:
+            for handler in self.handler_snapshot:
+                handler(*args)
 
-        self.handlers -= self.to_remove
-        self.to_remove = set()
+# Log messages tend to arrive in bursts which all share the same timestamp, so
+# parse_timestamp remembers the last timestamp it parsed and reuses it when
+# the next one is the same
+_last_stamp = None
+_last_timestamp = None
 
 def parse_timestamp(buffer):
     """
     Parses the timestamp of the message, returning both the timestamp as well as
     the rest of the message.
 
-    >>> timestamp, rest_of_buffer = parse_timestamp(b'2016/11/04 15:24:09: Blah blah')
-    >>> assert timestamp == datetime.datetime(2016, 11, 04, 15, 24, 9)
+    >>> timestamp, rest_of_buffer = parse_timestamp(b'11/04/2016 - 15:24:09: Blah blah')
+    >>> assert timestamp == datetime.datetime(2016, 11, 4, 15, 24, 9)
     >>> assert rest_of_buffer == b'Blah blah'
     """
-    int_buffer = []
-    month, day, year, hour, minute, second = None, None, None, None, None, None
-    for idx, char in enumerate(buffer):
-        if char == ord(b'/'):
-            if month is None:
-                month = int(bytes(int_buffer))
-                int_buffer = []
-            elif day is None:
-                day = int(bytes(int_buffer))
-                int_buffer = []
-        elif char == ord(b' '):
-            if year is None:
-                year = int(bytes(int_buffer))
-                int_buffer = []
-        elif char == ord(b':'):
-            if hour is None:
-                hour = int(bytes(int_buffer))
-                int_buffer = []
-            elif minute is None:
-                minute = int(bytes(int_buffer))
-                int_buffer = []
-            elif second is None:
-                second = int(bytes(int_buffer))
-                # Don't bother clearing the buffer, since this is the last 
-                # entry in the string
-                break
-        elif char in b'0123456789':
-            int_buffer.append(char)
-
-    timestamp = datetime.datetime(year, month, day, hour, minute, second)
-    
-    # The offset here accounts for the colon at the beginning
-    buffer = buffer[idx + 2:]
-
+    global _last_stamp, _last_timestamp
+
+    # Log timestamps are of the form 'MM/DD/YYYY - HH:MM:SS: '. Usually every
+    # field is zero-padded, in which case the digits are always at the same
+    # offsets and can be converted directly.
+    is_padded = (len(buffer) >= 23 and
+                 buffer[2] == buffer[5] == ord('/') and
+                 buffer[15] == buffer[18] == ord(':') and
+                 buffer[10:13] == b' - ' and
+                 buffer[21:23] == b': ')
+
+    if is_padded:
+        stamp, buffer = buffer[:21], buffer[23:]
+    else:
+        stamp, buffer = buffer.split(b': ', maxsplit=1)
+
+    if stamp == _last_stamp:
+        return _last_timestamp, buffer
+
+    if is_padded:
+        # The '48's are ord('0'), which turn each ASCII digit into its value
+        timestamp = datetime.datetime(
+            ((stamp[6] - 48) * 1000 + (stamp[7] - 48) * 100 +
+             (stamp[8] - 48) * 10 + (stamp[9] - 48)),
+            (stamp[0] - 48) * 10 + (stamp[1] - 48),
+            (stamp[3] - 48) * 10 + (stamp[4] - 48),
+            (stamp[13] - 48) * 10 + (stamp[14] - 48),
+            (stamp[16] - 48) * 10 + (stamp[17] - 48),
+            (stamp[19] - 48) * 10 + (stamp[20] - 48))
+    else:
+        # The server doesn't always zero-pad the individual fields, though, so
+        # fall back to splitting on the separators
+        date, time = stamp.split(b' - ')
+        month, day, year = date.split(b'/')
+        hour, minute, second = time.split(b':')
+
+        timestamp = datetime.datetime(int(year), int(month), int(day),
+                                      int(hour), int(minute), int(second))
+
+    _last_stamp, _last_timestamp = stamp, timestamp
     return timestamp, buffer
 
+# The same players show up in the log over and over again, so there's no sense
+# in re-parsing their information every time
+@functools.lru_cache(maxsize=256)
 def parse_player_info(player_blob):
     """
     Parses out the full information on a player, returning a tuple:
@@ -116,32 +140,44 @@ def parse_player_info(player_blob):
 
     >>> parse_player_info(b'bot name<1><BOT><CT>')
     (b'bot name', b'1', b'BOT', b'CT')
-    """
-    # We're parsing this out of 'PLAYER NAME<PLAYER_ID><USER_ID><TEAM>', for reference
-    player_blob = player_blob.strip(b'>')
-    player_name_with_id, user_id, team = player_blob.split(b'><')
-    player_name, player_id = player_name_with_id.split(b'<')
 
-    return player_name, player_id, user_id, team
+    Raises a ValueError if the player information is malformed.
+    """
+    # We're parsing this out of 'PLAYER NAME<PLAYER_ID><USER_ID><TEAM>', for reference.
+    # Players can put '<' and '>' in their names, but the other fields never
+    # contain them, so find the fields by working backwards from the end.
+    team_end = player_blob.rfind(b'>')
+    team_start = player_blob.rfind(b'<', 0, team_end)
+    user_id_end = player_blob.rfind(b'>', 0, team_start)
+    user_id_start = player_blob.rfind(b'<', 0, user_id_end)
+    player_id_end = player_blob.rfind(b'>', 0, user_id_start)
+    player_id_start = player_blob.rfind(b'<', 0, player_id_end)
+
+    # A missing '<' or '>' shows up as -1, which (since it's passed on as the
+    # end of the next search) can also make the later offsets wrap around. So
+    # the only way to be sure all the fields were found is that their offsets
+    # come one after the other.
+    if not (0 <= player_id_start < player_id_end < user_id_start <
+            user_id_end < team_start < team_end):
+        raise ValueError('{!r} is not valid player information'.format(player_blob))
+
+    return (player_blob[:player_id_start],
+            player_blob[player_id_start + 1:player_id_end],
+            player_blob[user_id_start + 1:user_id_end],
+            player_blob[team_start + 1:team_end])
 
 def get_quoted_strings(message):
     """
-    A generator that provides all the quoted strings in the message.
+    Returns a list of all the quoted strings in the message.
 
-    >>> results = get_quoted_strings(b'"Quoted" not quoted "quoted again"')
-    >>> next(results)
-    b'Quoted'
-    >>> next(results) # Next entry would raise StopIteration
-    b'quoted again'
+    >>> get_quoted_strings(b'"Quoted" not quoted "quoted again"')
+    [b'Quoted', b'quoted again']
     """
-    buffer = []
-    quoted = False
-    for char in message:
-        if char == ord(b'"'):
-            quoted = not quoted
-
-            if not quoted and buffer:
-                yield bytes(buffer)
-                buffer = []
-        elif quoted:
-            buffer.append(char)
+    # Quotes aren't escaped in the log format, so splitting on them leaves the
+    # quoted strings at the odd indexes. If there are an odd number of quotes,
+    # then the last string is never closed and doesn't count.
+    parts = message.split(b'"')
+    if len(parts) % 2 == 0:
+        parts.pop()
+
+    return [part for part in parts[1::2] if part]
@@ -2,6 +2,7 @@ from datetime import datetime
 import socket
 from threading import Thread
 import unittest
+from unittest import mock
 
 from rcon.log_parser import *
 
@@ -74,5 +75,51 @@ class LogSocketTest(unittest.TestCase):
 
         self.assertEqual(messages, expected_messages)
 
+class DroppedDatagramsTest(unittest.TestCase):
+    def setUp(self):
+        self.log_proc = LogSocket('127.0.0.1', 0)
+
+    def test_ignores_unchanged_count(self):
+        with self.assertNoLogs('rcon.log_parser'):
+            self.log_proc._update_dropped_datagrams(0)
+
+        self.assertEqual(self.log_proc.dropped_datagrams, 0)
+
+    def test_warns_on_increase(self):
+        with self.assertLogs('rcon.log_parser', 'WARNING') as logs:
+            self.log_proc._update_dropped_datagrams(3)
+
+        self.assertEqual(self.log_proc.dropped_datagrams, 3)
+        self.assertIn('3 log datagrams were dropped', logs.output[0])
+
+    def test_counts_across_wraparound(self):
+        self.log_proc.dropped_datagrams = 2 ** 32 - 2
+        with self.assertLogs('rcon.log_parser', 'WARNING') as logs:
+            self.log_proc._update_dropped_datagrams(3)
+
+        self.assertEqual(self.log_proc.dropped_datagrams, 3)
+        self.assertIn('5 log datagrams were dropped', logs.output[0])
+
+    @mock.patch('rcon.log_parser.time.monotonic')
+    def test_rate_limits_warnings(self, monotonic):
+        monotonic.return_value = 100
+        with self.assertLogs('rcon.log_parser', 'WARNING'):
+            self.log_proc._update_dropped_datagrams(1)
+
+        # Drops inside of the interval are counted, but not reported yet
+        monotonic.return_value = 101
+        with self.assertNoLogs('rcon.log_parser'):
+            self.log_proc._update_dropped_datagrams(3)
+            self.log_proc._update_dropped_datagrams(6)
+
+        self.assertEqual(self.log_proc.dropped_datagrams, 6)
+
+        monotonic.return_value = 100 + LogSocket.DROP_WARNING_INTERVAL
+        with self.assertLogs('rcon.log_parser', 'WARNING') as logs:
+            self.log_proc._update_dropped_datagrams(7)
+
+        self.assertIn('6 log datagrams were dropped (7 in total)',
+                      logs.output[0])
+
 if __name__ == '__main__':
     unittest.main()
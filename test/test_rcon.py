@@ -0,0 +1,66 @@
+import unittest
+
+from rcon.rcon import *
+
+class ExecuteCommandsTest(unittest.TestCase):
+    def setUp(self):
+        # execute_commands only goes through execute_command, so there's no
+        # need for a connection to a real server
+        self.rcon = RCON.__new__(RCON)
+        self.sent = []
+
+        def execute_command(command):
+            if len(command) > MAX_BODY_SIZE:
+                raise ValueError('Cannot have a body size above {} bytes'.format(MAX_BODY_SIZE))
+
+            self.sent.append(command)
+            return '<' + command + '>'
+
+        self.rcon.execute_command = execute_command
+
+    def test_empty(self):
+        result = self.rcon.execute_commands([])
+
+        self.assertEqual(result, '')
+        self.assertEqual(self.sent, [])
+
+    def test_batches(self):
+        result = self.rcon.execute_commands(['say a', 'say b', 'say c'])
+
+        self.assertEqual(self.sent, ['say a; say b; say c'])
+        self.assertEqual(result, '<say a; say b; say c>')
+
+    def test_splits_at_max_body_size(self):
+        # Together with the '; ' separator, these two fill a packet exactly
+        first = 'a' * 2000
+        second = 'b' * (MAX_BODY_SIZE - 2000 - 2)
+        third = 'c'
+
+        self.rcon.execute_commands([first, second, third])
+        self.assertEqual(self.sent, [first + '; ' + second, third])
+        self.assertEqual(len(self.sent[0]), MAX_BODY_SIZE)
+
+    def test_splits_one_past_max_body_size(self):
+        first = 'a' * 2000
+        second = 'b' * (MAX_BODY_SIZE - 2000 - 1)
+
+        self.rcon.execute_commands([first, second])
+        self.assertEqual(self.sent, [first, second])
+
+    def test_too_large_command(self):
+        with self.assertRaises(ValueError):
+            self.rcon.execute_commands(['say a', 'b' * (MAX_BODY_SIZE + 1)])
+
+        # The command is sent on its own, so what came before it still went
+        # through
+        self.assertEqual(self.sent, ['say a'])
+
+    def test_sends_quotes_and_semicolons_alone(self):
+        commands = ['say a', 'say "unmatched', 'say b', 'say c; say d', 'say e']
+        self.rcon.execute_commands(commands)
+
+        self.assertEqual(self.sent,
+            ['say a', 'say "unmatched', 'say b', 'say c; say d', 'say e'])
+
+if __name__ == '__main__':
+    unittest.main()
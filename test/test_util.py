@@ -1,3 +1,4 @@
+import datetime
 import unittest
 
 from rcon.util import *
@@ -31,6 +32,29 @@ class DispatcherTest(unittest.TestCase):
         self.assertEqual(callback_args, (1, 2, 3))
         self.assertEqual(callback_kwargs, {'a': 4, 'b': 5})
 
+    def test_fires_in_registration_order(self):
+        dispatch = Dispatcher()
+        called = []
+
+        for idx in range(10):
+            dispatch.register(lambda idx=idx: called.append(idx))
+
+        dispatch.fire()
+        self.assertEqual(called, list(range(10)))
+
+    def test_registers_handlers_once(self):
+        dispatch = Dispatcher()
+        called = 0
+
+        def func():
+            nonlocal called
+            called += 1
+
+        dispatch.register(func)
+        dispatch.register(func)
+        dispatch.fire()
+        self.assertEqual(called, 1)
+
     def test_doesnt_fire_unregistered_handlers(self):
         dispatch = Dispatcher()
         called = 0
@@ -58,6 +82,25 @@ class DispatcherTest(unittest.TestCase):
         dispatch.fire()
         self.assertEqual(called, 1)
 
+    def test_register_in_fire(self):
+        dispatch = Dispatcher()
+        called = 0
+
+        def other_func():
+            nonlocal called
+            called += 1
+
+        @dispatch.register
+        def func():
+            dispatch.unregister(func)
+            dispatch.register(other_func)
+
+        dispatch.fire()
+        self.assertEqual(called, 0)
+
+        dispatch.fire()
+        self.assertEqual(called, 1)
+
 class ParseTimestampTest(unittest.TestCase):
     def test_parses(self):
         message = b'11/20/2016 - 13:05:40: This has junk on the end'
@@ -71,6 +114,26 @@ class ParseTimestampTest(unittest.TestCase):
 
         self.assertEqual(rest, b'This has junk on the end')
 
+    def test_parses_unpadded(self):
+        message = b'1/2/2000 - 3:4:5: This has junk on the end'
+        date, rest = parse_timestamp(message)
+
+        self.assertEqual(date, datetime.datetime(2000, 1, 2, 3, 4, 5))
+        self.assertEqual(rest, b'This has junk on the end')
+
+    def test_parses_changing_timestamps(self):
+        messages = [
+            (b'11/20/2016 - 13:05:40: First', datetime.datetime(2016, 11, 20, 13, 5, 40)),
+            (b'11/20/2016 - 13:05:40: Second', datetime.datetime(2016, 11, 20, 13, 5, 40)),
+            (b'11/20/2016 - 13:05:41: Third', datetime.datetime(2016, 11, 20, 13, 5, 41)),
+            (b'11/20/2016 - 13:5:41: Fourth', datetime.datetime(2016, 11, 20, 13, 5, 41)),
+            (b'11/20/2016 - 13:05:40: Fifth', datetime.datetime(2016, 11, 20, 13, 5, 40)),
+        ]
+
+        for message, expected_date in messages:
+            date, _ = parse_timestamp(message)
+            self.assertEqual(date, expected_date)
+
 class ParsePlayerInfoTest(unittest.TestCase):
     def test_parses_unassigned_human(self):
         message = b'adamnew123456<2><[U:1:89408849]><Unassigned>'
@@ -102,6 +165,17 @@ class ParsePlayerInfoTest(unittest.TestCase):
 
         self.assertEqual(info, (b'(BOT) Brad', b'4', b'BOT', b''))
 
+    def test_parses_brackets_in_name(self):
+        message = b'<<Brad>><4><BOT><CT>'
+        info = parse_player_info(message)
+
+        self.assertEqual(info, (b'<<Brad>>', b'4', b'BOT', b'CT'))
+
+    def test_rejects_malformed(self):
+        for message in (b'foo', b'name<1><2>', b'name<1>', b'<><>', b''):
+            with self.assertRaises(ValueError):
+                parse_player_info(message)
+
 class GetQuotedStringsTest(unittest.TestCase):
     def test_no_qs(self):
         message = b'Nothing in here is quoted'
@@ -118,5 +192,10 @@ class GetQuotedStringsTest(unittest.TestCase):
         qs = list(get_quoted_strings(message))
         self.assertEqual(qs, [b'Something', b'quoted'])
 
+    def test_unterminated_qs(self):
+        message = b'Something in here is "quoted" and "unterminated'
+        qs = list(get_quoted_strings(message))
+        self.assertEqual(qs, [b'quoted'])
+
 if __name__ == '__main__':
     unittest.main()